@@ -0,0 +1,303 @@
+import argparse
+import json
+import math
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+
+# The dummy video driver lets pygame open a window without a real display,
+# so this has to be set before pygame is imported by the GUI module.
+# Hiding the support prompt keeps stdout valid JSON.
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import pygame
+from GUI import GUI
+
+
+class CountingFont:
+    """
+    A wrapper around a pygame font that counts how often text gets rendered.
+
+    Attributes:
+        font (pygame.font.Font): The wrapped font.
+        render_calls (int): Number of render calls since the last reset.
+        size_calls (int): Number of size calls since the last reset.
+    """
+
+    def __init__(self, font):
+        self.font = font
+        self.render_calls = 0
+        self.size_calls = 0
+
+    def render(self, *args, **kwargs):
+        self.render_calls += 1
+        return self.font.render(*args, **kwargs)
+
+    def size(self, text):
+        self.size_calls += 1
+        return self.font.size(text)
+
+    def reset(self):
+        self.render_calls = 0
+        self.size_calls = 0
+
+    def __getattr__(self, name):
+        return getattr(self.font, name)
+
+
+def percentile(values, p):
+    """Return the p-th percentile (0-100) of values using nearest rank"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, math.ceil(p / 100 * len(ordered)) - 1))
+    return ordered[idx]
+
+
+def summarize(times, render_calls):
+    """Summarize per-frame timings (in seconds) and render calls"""
+    ms = [t * 1000 for t in times]
+    return {
+        "frames": len(ms),
+        "frame_ms": {
+            "mean": sum(ms) / len(ms) if ms else 0.0,
+            "p50": percentile(ms, 50),
+            "p90": percentile(ms, 90),
+            "p99": percentile(ms, 99),
+            "max": max(ms) if ms else 0.0,
+        },
+        "render_calls_per_frame": sum(render_calls) / len(render_calls) if render_calls else 0.0,
+    }
+
+
+def make_gui():
+    """Create a GUI without a client and with a counting font"""
+    gui = GUI()
+    gui.font = CountingFont(gui.font)
+    gui.set_online_users(["Benny", "David"])
+    gui.update_text_surface()
+    return gui
+
+
+def make_message(message_length):
+    """Return space separated words of message_length characters, so the text wraps"""
+    word = "lorem "
+    return (word * (message_length // len(word) + 1))[:message_length]
+
+
+def fill_history(gui, size, message_length):
+    """Add size messages of roughly message_length characters to the chat log"""
+    message = make_message(message_length)
+    for i in range(size):
+        gui.add_message(f"user{i % 10}: {message}")
+
+
+def run_frames(gui, frames, post_events=None):
+    """
+    Run frames of the main loop without the frame rate limit.
+
+    Args:
+        gui (GUI): The GUI to drive.
+        frames (int): Number of frames to run.
+        post_events (callable): Optional callback posting events for a frame index.
+
+    Returns:
+        tuple: Frame times in seconds and render calls per frame.
+    """
+    times = []
+    render_calls = []
+    for i in range(frames):
+        if post_events:
+            post_events(i)
+        gui.font.reset()
+        start = time.perf_counter()
+        gui.handle_events()
+        gui.draw_ui()
+        pygame.display.flip()
+        times.append(time.perf_counter() - start)
+        render_calls.append(gui.font.render_calls)
+    return times, render_calls
+
+
+def key_event(key, unicode=""):
+    return pygame.event.Event(pygame.KEYDOWN, key=key, unicode=unicode, mod=0)
+
+
+def bench_idle(history, frames, message_length):
+    """Redraw a static chat log of a given size"""
+    gui = make_gui()
+    fill_history(gui, history, message_length)
+    return summarize(*run_frames(gui, frames))
+
+
+def bench_burst(history, frames, message_length):
+    """Receive one new message per frame on top of an existing history"""
+    gui = make_gui()
+    fill_history(gui, history, message_length)
+    message = make_message(message_length)
+    add_times = []
+
+    def post(i):
+        start = time.perf_counter()
+        gui.add_message(f"burst{i}: {message}")
+        add_times.append(time.perf_counter() - start)
+
+    result = summarize(*run_frames(gui, frames, post))
+    result["add_message_ms"] = {
+        "p50": percentile([t * 1000 for t in add_times], 50),
+        "p99": percentile([t * 1000 for t in add_times], 99),
+    }
+    return result
+
+
+def bench_scroll(history, frames, message_length):
+    """Scroll up through the chat log and back down again"""
+    gui = make_gui()
+    fill_history(gui, history, message_length)
+
+    def post(i):
+        key = pygame.K_UP if i < frames // 2 else pygame.K_DOWN
+        pygame.event.post(key_event(key))
+
+    return summarize(*run_frames(gui, frames, post))
+
+
+def bench_typing(history, frames, message_length):
+    """Type words into the active input box, sending a message every message_length characters"""
+    gui = make_gui()
+    fill_history(gui, history, message_length)
+    gui.input_active = True
+    gui.color = gui.color_active
+
+    length = max(2, message_length)
+
+    def post(i):
+        # words of five letters, so long input wraps into several lines
+        if i % length == length - 1:
+            pygame.event.post(key_event(pygame.K_RETURN))
+        elif i % 6 == 5:
+            pygame.event.post(key_event(pygame.K_SPACE, " "))
+        else:
+            pygame.event.post(key_event(pygame.K_a, "a"))
+
+    return summarize(*run_frames(gui, frames, post))
+
+
+def bench_memory(history, message_length):
+    """Measure memory allocated while filling the chat log"""
+    gui = make_gui()
+    tracemalloc.start()
+    fill_history(gui, history, message_length)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"current_bytes": current, "peak_bytes": peak}
+
+
+def bench_wrap_text(lengths, repeats):
+    """Time wrap_text for messages of different lengths"""
+    gui = make_gui()
+    results = {}
+    for length in lengths:
+        message = ("word " * (length // 5 + 1))[:length]
+        times = []
+        size_calls = 0
+        for _ in range(repeats):
+            gui.font.reset()
+            start = time.perf_counter()
+            gui.wrap_text([message], gui.chat_area.width - 20)
+            times.append(time.perf_counter() - start)
+            size_calls += gui.font.size_calls
+        ms = [t * 1000 for t in times]
+        results[str(length)] = {
+            "p50_ms": percentile(ms, 50),
+            "p99_ms": percentile(ms, 99),
+            "size_calls": size_calls / repeats,
+        }
+    return results
+
+
+def git_revision():
+    """Return the git revision of the measured tree, or None outside a git checkout"""
+    try:
+        revision = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return revision + ("-dirty" if dirty else "")
+
+
+def font_info():
+    """Return the font the GUI resolves to, since SysFont falls back when Courier is missing"""
+    gui = make_gui()
+    path = pygame.font.match_font("Courier")
+    return {
+        "requested": "Courier",
+        "path": path or pygame.font.get_default_font(),
+        "fallback": path is None,
+        "size": gui.FONT_SIZE,
+        "line_height": gui.font.get_linesize(),
+    }
+
+
+SCENARIOS = {
+    "idle": bench_idle,
+    "burst": bench_burst,
+    "scroll": bench_scroll,
+    "typing": bench_typing,
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless rendering benchmark for the chat GUI")
+    parser.add_argument("--history", type=int, nargs="+", default=[0, 100, 1000, 5000],
+                        help="chat history sizes to benchmark")
+    parser.add_argument("--frames", type=int, default=200, help="frames per scenario")
+    parser.add_argument("--message-length", type=int, default=80, help="characters per message")
+    parser.add_argument("--wrap-lengths", type=int, nargs="+", default=[10, 100, 1000, 5000],
+                        help="message lengths for the wrap_text benchmark")
+    parser.add_argument("--scenarios", nargs="+", choices=sorted(SCENARIOS), default=sorted(SCENARIOS))
+    parser.add_argument("--output", help="write the JSON report to this file instead of stdout")
+    args = parser.parse_args(argv)
+
+    report = {
+        "revision": git_revision(),
+        "pygame": pygame.version.ver,
+        "font": font_info(),
+        "video_driver": os.environ["SDL_VIDEODRIVER"],
+        "frames": args.frames,
+        "message_length": args.message_length,
+        "scenarios": {},
+        "memory": {},
+        "wrap_text": bench_wrap_text(args.wrap_lengths, 20),
+    }
+    for name in args.scenarios:
+        report["scenarios"][name] = {
+            str(history): SCENARIOS[name](history, args.frames, args.message_length)
+            for history in args.history
+        }
+    for history in args.history:
+        report["memory"][str(history)] = bench_memory(history, args.message_length)
+
+    pygame.quit()
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
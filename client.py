@@ -1,7 +1,13 @@
+import os
 import socket
+import tempfile
 import threading
 from GUI import GUI
 
+# directory that downloaded attachments are saved to
+DOWNLOAD_DIR = "downloads"
+CHUNK_SIZE = 64 * 1024
+
 
 class ChatClient:
     """
@@ -15,17 +21,23 @@ class ChatClient:
 
     Methods:
         receive(): Handles incoming messages from the server.
-        send(data): Sends user input to the server.
+        send_text(data): Sends user input to the server.
+        send_file(path): Uploads a file on the file channel and shares a reference to it.
+        download_file(file_hash): Downloads a shared file on the file channel.
         connect_to_server(): Connects the socket to the server and sends the user's name.
         close(): Closes the socket.
         run_client(): Runs the chat client, initializing the GUI, 
         connecting to the server, and starting a thread for receiving messages.
     """
 
-    def __init__(self, server_address, port):
+    def __init__(self, server_address, port, file_port=None):
         # Initialize the chat client
         self.s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         self.server_address = (server_address, port)
+        # attachments are transferred on a separate port so they don't block the chat
+        self.file_address = (server_address, file_port or port + 1)
+        # file names of attachments shared in the chat, by hash
+        self.attachments = dict()
         self.name = ""
         self.gui = None
 
@@ -46,13 +58,95 @@ class ChatClient:
                         self.gui.add_message(data[1:])
                     case "c":
                         self.gui.set_online_users(data[1:].split(" "))
+                    case "a":
+                        parts = data[1:].split(" ", 3)
+                        if len(parts) == 4:
+                            sender, file_hash, size, filename = parts
+                            self.attachments[file_hash] = filename
+                            self.gui.add_message(
+                                f"{sender} shared {filename} ({size} bytes), /download {file_hash}"
+                            )
 
     def send_text(self, data):
         """Send user input to the server"""
+        # /upload and /download commands are handled on the file channel
+        if data.startswith("/upload "):
+            self.send_file(data[len("/upload "):].strip())
+            return
+        if data.startswith("/download "):
+            self.download_file(data[len("/download "):].strip())
+            return
         #t as first char in string tells the server that it's a text message
         message = "t"+data
         self.s.sendall(message.encode("utf-8"))
 
+    def send_file(self, path):
+        """Upload a file in the background and share a reference to it in the chat"""
+        threading.Thread(target=self._upload, args=(path,), daemon=True).start()
+
+    def _upload(self, path):
+        try:
+            size = os.path.getsize(path)
+            with socket.create_connection(self.file_address) as f_socket, open(path, "rb") as f:
+                # u as first char announces a file of the given size, which the server accepts with ok
+                f_socket.sendall(("u" + str(size) + "\n").encode("utf-8"))
+                stream = f_socket.makefile("rb")
+                response = stream.readline().decode("utf-8").strip()
+                if response == "ok":
+                    f_socket.sendfile(f)
+                    response = stream.readline().decode("utf-8").strip()
+        except OSError as e:
+            self._notify(f"Upload of {path} failed: {e}")
+            return
+        if len(response) != 64:
+            self._notify(f"Upload of {path} failed: {response}")
+            return
+        #a as first char tells the server that it's a reference to an attachment
+        message = "a" + response + " " + os.path.basename(path)
+        self.s.sendall(message.encode("utf-8"))
+
+    def download_file(self, file_hash):
+        """Download a shared file in the background into the download directory"""
+        threading.Thread(target=self._download, args=(file_hash,), daemon=True).start()
+
+    def _download(self, file_hash):
+        filename = os.path.basename(self.attachments.get(file_hash, file_hash)) or file_hash
+        # the hash prefix keeps different attachments with the same name apart
+        path = os.path.join(DOWNLOAD_DIR, file_hash[:8] + "-" + filename)
+        tmp_path = None
+        try:
+            with socket.create_connection(self.file_address) as f_socket:
+                # d as first char requests the attachment with the given hash
+                f_socket.sendall(("d" + file_hash + "\n").encode("utf-8"))
+                stream = f_socket.makefile("rb")
+                response = stream.readline().decode("utf-8").strip()
+                if not response.isdigit():
+                    self._notify(f"Download of {file_hash} failed: {response}")
+                    return
+                remaining = int(response)
+                os.makedirs(DOWNLOAD_DIR, exist_ok=True)
+                # write to a temporary file, so a failed download never looks like a finished one
+                fd, tmp_path = tempfile.mkstemp(dir=DOWNLOAD_DIR, suffix=".part")
+                with os.fdopen(fd, "wb") as f:
+                    while remaining > 0:
+                        chunk = stream.read(min(CHUNK_SIZE, remaining))
+                        if not chunk:
+                            raise ConnectionResetError("download ended early")
+                        f.write(chunk)
+                        remaining -= len(chunk)
+                os.replace(tmp_path, path)
+        except OSError as e:
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            self._notify(f"Download of {file_hash} failed: {e}")
+            return
+        self._notify(f"Saved {filename} to {path}")
+
+    def _notify(self, message):
+        """Show a local status message in the GUI"""
+        if self.gui:
+            self.gui.add_message(message)
+
     def send_name(self, name):
         self.s.sendall(name.encode("utf-8"))
         return self.s.recv(1024).decode("utf-8")
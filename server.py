@@ -1,9 +1,22 @@
+import hashlib
+import mmap
+import os
 import socket
+import tempfile
 import threading
+import unicodedata
 
 # a dictionary to store all client sockets
 clients = dict()
 
+# port of the channel used for bulk file transfers, separate from the chat port
+FILE_PORT = 54322
+# directory of the content-addressed attachment store
+STORE_DIR = "attachments"
+# largest attachment the server accepts
+MAX_ATTACHMENT_SIZE = 100 * 1024 * 1024
+CHUNK_SIZE = 64 * 1024
+
 def handle_client(c_socket):
     """handles a client's interaction with the server"""
     name = ""
@@ -39,6 +52,11 @@ def handle_client(c_socket):
                 case "t":
                     message = "t" + name + ": " + data[1:]
                     broadcast(message)
+                # data is a reference to an uploaded attachment: "a<hash> <filename>"
+                case "a":
+                    message = attachment_message(name, data[1:])
+                    if message:
+                        broadcast(message)
                 # c means client has disconnected
                 case "c":
                     remove_client(name)
@@ -62,7 +80,121 @@ def broadcast(message):
             # remove the socket from the dictionary if it can't be reached
             remove_client(name)
 
+def attachment_path(file_hash):
+    """returns the path of a stored attachment or None if the hash is unknown"""
+    if len(file_hash) != 64 or any(ch not in "0123456789abcdef" for ch in file_hash):
+        return None
+    path = os.path.join(STORE_DIR, file_hash)
+    return path if os.path.isfile(path) else None
+
+def clean_filename(filename):
+    """reduces a client supplied file name to a single line base name"""
+    filename = os.path.basename(filename.replace("\\", "/"))
+    # drop control characters and any whitespace other than plain spaces
+    filename = "".join(
+        ch for ch in filename
+        if ch == " " or unicodedata.category(ch)[0] not in ("C", "Z")
+    )
+    return filename.strip()
+
+def attachment_message(name, reference):
+    """builds the broadcast "a<sender> <hash> <size> <filename>" from the store, not the client"""
+    parts = reference.split(" ", 1)
+    if len(parts) != 2:
+        return None
+    path = attachment_path(parts[0])
+    filename = clean_filename(parts[1])
+    if path is None or filename == "":
+        return None
+    return "a" + name + " " + parts[0] + " " + str(os.path.getsize(path)) + " " + filename
+
+def store_upload(stream, size):
+    """streams an upload into the store and returns its sha256 hash"""
+    digest = hashlib.sha256()
+    fd, tmp_path = tempfile.mkstemp(dir=STORE_DIR)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            remaining = size
+            while remaining > 0:
+                chunk = stream.read(min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    raise ConnectionResetError("upload ended early")
+                digest.update(chunk)
+                f.write(chunk)
+                remaining -= len(chunk)
+        file_hash = digest.hexdigest()
+        path = os.path.join(STORE_DIR, file_hash)
+        if os.path.exists(path):
+            # identical file is already stored, keep only one copy
+            os.remove(tmp_path)
+        else:
+            os.replace(tmp_path, path)
+        return file_hash
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def send_attachment(f_socket, path):
+    """sends a stored attachment, prefixed by its size, without copying it through python"""
+    size = os.path.getsize(path)
+    f_socket.sendall((str(size) + "\n").encode("utf-8"))
+    with open(path, "rb") as f:
+        if hasattr(os, "sendfile"):
+            offset = 0
+            while offset < size:
+                sent = os.sendfile(f_socket.fileno(), f.fileno(), offset, size - offset)
+                if sent == 0:
+                    break
+                offset += sent
+        elif size:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+                f_socket.sendall(m)
+
+def handle_file_client(f_socket):
+    """handles one upload ("u<size>") or download ("d<hash>") on the file channel"""
+    with f_socket, f_socket.makefile("rb") as stream:
+        try:
+            request = stream.readline(128).decode("utf-8").strip()
+            if request == "":
+                return
+            match request[0]:
+                # upload: accept the size before the body is sent, then reply with the hash
+                case "u":
+                    size = int(request[1:])
+                    if size < 0:
+                        f_socket.sendall("invalid_size\n".encode("utf-8"))
+                        return
+                    if size > MAX_ATTACHMENT_SIZE:
+                        f_socket.sendall("too_large\n".encode("utf-8"))
+                        return
+                    f_socket.sendall("ok\n".encode("utf-8"))
+                    file_hash = store_upload(stream, size)
+                    f_socket.sendall((file_hash + "\n").encode("utf-8"))
+                # download: reply with the size followed by the file
+                case "d":
+                    path = attachment_path(request[1:])
+                    if path is None:
+                        f_socket.sendall("not_found\n".encode("utf-8"))
+                    else:
+                        send_attachment(f_socket, path)
+        except (ValueError, ConnectionResetError, BrokenPipeError):
+            return
+
+def serve_files():
+    """accepts connections on the file channel so transfers never block the chat"""
+    os.makedirs(STORE_DIR, exist_ok=True)
+    f = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    f.bind(("", FILE_PORT))
+    f.listen()
+    while True:
+        f_socket, addr = f.accept()
+        f_thread = threading.Thread(target=handle_file_client, args=(f_socket,), daemon=True)
+        f_thread.start()
+
 if __name__ == "__main__":
+    # serve attachments on their own port
+    threading.Thread(target=serve_files, daemon=True).start()
     # get a socket
     s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
     # bind the socket to my port